@@ -1,178 +1,637 @@
 import math, numpy as np
+import functools
+import hashlib
+import operator
 import os
+import pickle
+import re
+import sys
+
+try:
+    import numba
+except ImportError:  # numba is optional; the JIT tier just turns off
+    numba = None
 
 
 #─── Global State ────────────────────────────────────────────────────────────────
 
 vars = {}         # variable store
 functions = {}    # user‐defined functions
-builtin_functions = {}
 
 vars["pi"] = math.pi
 vars["e"] = math.e
 
-for name in dir(math):
-    func = getattr(math, name)
-    if callable(func):
-        builtin_functions[name] = func
+# Pure math builtins (no side effects, arity ≤ 3) get a bounded memo so
+# repeated calls on the same scalar args skip the libm call entirely.
+PURE_BUILTINS = {
+    "sin", "cos", "tan", "asin", "acos", "atan", "atan2", "sinh", "cosh",
+    "tanh", "asinh", "acosh", "atanh", "exp", "expm1", "log", "log2",
+    "log10", "log1p", "sqrt", "cbrt", "pow", "hypot", "floor", "ceil",
+    "fabs", "fmod", "copysign", "gamma", "lgamma", "erf", "erfc",
+}
+
+def memoize_builtin(func):
+    # functools.lru_cache is C-implemented, so the wrapper is itself a direct
+    # C entry point: a hit costs one C call, no Python frame. Only the scalar
+    # table is memoized and scalar args are always hashable, so no unhashable
+    # fallthrough is needed.
+    return functools.lru_cache(maxsize=4096)(func)
+
+class LazyBuiltins(dict):
+    """Builtin table that materializes entries on first use.
+
+    Instead of eagerly walking all of dir(math)+dir(np) at import, a
+    resolver is consulted on the first lookup of each name and the result
+    is cached in the dict, so the table only ever holds names user code
+    actually references.
+    """
+
+    def __init__(self, resolver):
+        super().__init__()
+        self.resolver = resolver
+
+    def __missing__(self, key):
+        func = self.resolver(key)
+        if func is None:
+            raise KeyError(key)
+        self[key] = func
+        return func
+
+    def __contains__(self, key):
+        if dict.__contains__(self, key):
+            return True
+        try:
+            self[key]
+            return True
+        except KeyError:
+            return False
 
-# Numpy functions (optional and larger)
-for name in dir(np):
-    if name.startswith("_"): continue
-    func = getattr(np, name)
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+def _resolve_scalar(name):
+    func = getattr(math, name, None)
+    if not callable(func):
+        return None
+    return memoize_builtin(func) if name in PURE_BUILTINS else func
+
+def _resolve_vec(name):
+    # Ufuncs only — non-numeric callables like np.save/np.load would just
+    # pollute the namespace.
+    func = getattr(np, name, None)
+    return func if isinstance(func, np.ufunc) else None
+
+def _resolve_merged(name):
+    # math.* wins name clashes; numpy's scalar calls pay ufunc dispatch
+    # and 0-d boxing.
+    func = getattr(math, name, None)
     if callable(func):
-        builtin_functions[name] = func
+        return func
+    return _resolve_vec(name)
+
+builtin_functions = LazyBuiltins(_resolve_merged)
+builtin_scalar = LazyBuiltins(_resolve_scalar)   # math.* — all-scalar args
+builtin_vec = LazyBuiltins(_resolve_vec)         # np.*   — any array arg
+
+def resolve_builtin(name, args):
+    # Pick the math.* variant for pure-scalar calls (no ufunc dispatch or 0-d
+    # boxing), the np.* ufunc when any argument is an array.
+    if any(isinstance(a, np.ndarray) for a in args):
+        func = builtin_vec.get(name)
+    else:
+        func = builtin_scalar.get(name)
+    return func if func is not None else builtin_functions.get(name)
+
+def available_builtin_names():
+    # Full listing for `help`; pays the module scan only when asked for.
+    names = {n for n in dir(math) if callable(getattr(math, n))}
+    names.update(n for n in dir(np) if not n.startswith("_")
+                 and isinstance(getattr(np, n), np.ufunc))
+    return sorted(names)
+
 
-        
 #─── Expression Parser ────────────────────────────────────────────────────────────
 
-def parse_factor(tokens):
-    token = tokens.pop(0)
-    
-    # Check for function call or parenthesized expression
-    if tokens and tokens[0] == "(":
-        tokens.pop(0)  # Consume "("
+def _div(a, b):
+    if b == 0:
+        raise ValueError("Division by zero")
+    return a / b
+
+# Branchless binop dispatch: one dict lookup to a C-level operator function
+# instead of a chain of string comparisons
+OPS = {"+": operator.add, "-": operator.sub, "*": operator.mul,
+       "/": _div, "^": operator.pow}
+
+class TokStream:
+    """Index-based cursor over a token list; avoids O(n) pop(0) shifts."""
+    __slots__ = ("tokens", "i")
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.i = 0
+
+    def peek(self):
+        return self.tokens[self.i] if self.i < len(self.tokens) else None
+
+    def consume(self):
+        tok = self.tokens[self.i]
+        self.i += 1
+        return tok
+
+    def __bool__(self):
+        return self.i < len(self.tokens)
+
+#─── AST Compilation ─────────────────────────────────────────────────────────────
+# Function bodies are parsed once at definition time into a tuple tree:
+#   ("num", v)  ("var", name)  ("call", name, [args])  ("binop", op, lhs, rhs)
+# so run_function_call never re-tokenizes or re-parses a body line.
+
+def ast_factor(tokens):
+    token = tokens.consume()
+
+    # Function call (or parenthesized argument list)
+    if tokens.peek() == "(":
+        tokens.consume()  # Consume "("
         args = []
-        if tokens and tokens[0] != ")":
-            args.append(eval_expr(tokens))
-            while tokens and tokens[0] == ",":
-                tokens.pop(0)
-                args.append(eval_expr(tokens))
+        if tokens and tokens.peek() != ")":
+            args.append(parse_to_ast(tokens))
+            while tokens.peek() == ",":
+                tokens.consume()
+                args.append(parse_to_ast(tokens))
         if not tokens:
             raise ValueError("Unclosed parenthesis")
-        tokens.pop(0)  # Consume ")"
-
-        # Check if it's a built-in function
-        if token in builtin_functions:
-            try:
-                return builtin_functions[token](*args)
-            except Exception as e:
-                raise ValueError(f"Error in builtin function {token}: {e}")
-        
-        # Check if it's a user-defined function
-        if token in functions:
-            res = run_function_call(token, args)
-            return res[0] if res else 0.0
-
-        # If no match, raise an error for unknown functions
-        raise ValueError(f"Unknown function: {token}")
+        tokens.consume()  # Consume ")"
+        return ("call", token, args)
 
     # Parenthesized without function name (just an expression)
     if token == "(":
-        v = eval_expr(tokens)
-        if not tokens or tokens.pop(0) != ")":
+        node = parse_to_ast(tokens)
+        if not tokens or tokens.consume() != ")":
             raise ValueError("Expected closing parenthesis")
-        return v
+        return node
 
-    # Look up variable
-    if token in vars:
-        return vars[token]
-
-    # Convert to float or raise error if not a number
+    # Numeric literal; anything else is a name resolved at evaluation time
     try:
-        return float(token)
+        return ("num", float(token))
     except ValueError:
-        raise ValueError(f"Unrecognized token or variable: {token}")
-
-def parse_exponent(tokens):
-    v = parse_factor(tokens)
-    while tokens and tokens[0] == "^":
-        tokens.pop(0)
-        v = v ** parse_factor(tokens)
-    return v
-
-def parse_term(tokens):
-    v = parse_exponent(tokens)
-    while tokens and tokens[0] in ("*", "/"):
-        op = tokens.pop(0)
-        rhs = parse_exponent(tokens)
-        if op == "*":
-            v *= rhs
-        else:
-            if rhs == 0:
-                raise ValueError("Division by zero")
-            v /= rhs
-    return v
-
-def eval_expr(tokens):
-    v = parse_term(tokens)
-    while tokens and tokens[0] in ("+", "-"):
-        op = tokens.pop(0)
-        rhs = parse_term(tokens)
-        v = v + rhs if op == "+" else v - rhs
-    return v
+        return ("var", token)
+
+# Operator precedence for the climbing parser; all operators are
+# left-associative here (including "^", matching the direct evaluator)
+_PREC = {"+": 1, "-": 1, "*": 2, "/": 2, "^": 3}
+
+def parse_to_ast(tokens, min_prec=1):
+    # Precedence climbing: one frame per binary operator instead of walking
+    # down every precedence level for every factor
+    if not isinstance(tokens, TokStream):
+        tokens = TokStream(tokens)
+    node = ast_factor(tokens)
+    while True:
+        prec = _PREC.get(tokens.peek())
+        if prec is None or prec < min_prec:
+            return node
+        op = tokens.consume()
+        node = ("binop", op, node, parse_to_ast(tokens, prec + 1))
+
+def eval_ast(node, local_vars):
+    tag = node[0]
+
+    if tag == "num":
+        return node[1]
+
+    if tag == "var":
+        name = node[1]
+        if name in local_vars:
+            return local_vars[name]
+        if name in vars:
+            return vars[name]
+        raise ValueError(f"Unrecognized token or variable: {name}")
+
+    if tag == "call":
+        name = node[1]
+        args = [eval_ast(a, local_vars) for a in node[2]]
+        func = resolve_builtin(name, args)
+        if func is not None:
+            try:
+                return func(*args)
+            except Exception as e:
+                raise ValueError(f"Error in builtin function {name}: {e}")
+        if name in functions:
+            res = run_function_call(name, args)
+            return res[0] if res else 0.0
+        raise ValueError(f"Unknown function: {name}")
+
+    # ("binop", op, lhs, rhs)
+    return OPS[node[1]](eval_ast(node[2], local_vars),
+                        eval_ast(node[3], local_vars))
+
+# Built-in constants folded into function bodies at compile time
+_CONST_NAMES = {"pi": math.pi, "e": math.e}
+
+def fold(node, local_names=frozenset()):
+    """Collapse AST subtrees that are independent of the arguments.
+
+    Post-order: binops whose children fold to numbers, and pure-builtin
+    calls on all-number args, are evaluated once at definition time.
+    pi/e fold too unless shadowed by a local name. Anything that raises
+    (domain error, division by zero) is left for runtime.
+    """
+    tag = node[0]
+    if tag == "num":
+        return node
+    if tag == "var":
+        if node[1] not in local_names and node[1] in _CONST_NAMES:
+            return ("num", _CONST_NAMES[node[1]])
+        return node
+    if tag == "call":
+        args = [fold(a, local_names) for a in node[2]]
+        if node[1] in PURE_BUILTINS and all(a[0] == "num" for a in args):
+            func = builtin_scalar.get(node[1])
+            if func is not None:
+                try:
+                    return ("num", func(*(a[1] for a in args)))
+                except Exception:
+                    pass
+        return ("call", node[1], args)
+    # ("binop", op, lhs, rhs)
+    lhs = fold(node[2], local_names)
+    rhs = fold(node[3], local_names)
+    if lhs[0] == "num" and rhs[0] == "num":
+        try:
+            return ("num", eval_ast(("binop", node[1], lhs, rhs), {}))
+        except Exception:  # e.g. overflow, division by zero — defer to runtime
+            pass
+    return ("binop", node[1], lhs, rhs)
+
+#─── Bytecode Compilation ────────────────────────────────────────────────────────
+# A whole body is flattened post-order into one list of opcode tuples:
+#   ("const", v)  ("local", slot)  ("global", name)  ("call", name, nargs)
+#   ("binop", op_callable)  ("store", slot)
+# executed by a single loop over a value stack, so hot function bodies pay no
+# recursive eval_ast frames per node. Local names are resolved to small-int
+# list slots at compile time — bodies have no control flow, so a name is local
+# exactly from its first store onward; earlier uses fall back to the globals.
+
+def compile_body_to_bc(args, compiled_body):
+    slot_map = {name: i for i, name in enumerate(args)}
+    out = []
+
+    def emit(node):
+        tag = node[0]
+        if tag == "num":
+            out.append(("const", node[1]))
+        elif tag == "var":
+            idx = slot_map.get(node[1])
+            if idx is not None:
+                out.append(("local", idx))
+            else:
+                out.append(("global", node[1]))
+        elif tag == "call":
+            for a in node[2]:
+                emit(a)
+            out.append(("call", sys.intern(node[1]), len(node[2])))
+        else:  # ("binop", op, lhs, rhs) — the opcode holds the C callable
+            emit(node[2])
+            emit(node[3])
+            out.append(("binop", OPS[node[1]]))
+
+    for lhs, ast in compiled_body:
+        emit(ast)
+        if lhs not in slot_map:
+            slot_map[lhs] = len(slot_map)
+        out.append(("store", slot_map[lhs]))
+
+    return out, slot_map
+
+def exec_bytecode(bytecode, slots):
+    stack = []
+    for op in bytecode:
+        opc = op[0]
+        if opc == "const":
+            stack.append(op[1])
+        elif opc == "local":
+            stack.append(slots[op[1]])
+        elif opc == "global":
+            name = op[1]
+            if name in vars:
+                stack.append(vars[name])
+            else:
+                raise ValueError(f"Unrecognized token or variable: {name}")
+        elif opc == "binop":
+            rhs = stack.pop()
+            stack.append(op[1](stack.pop(), rhs))
+        elif opc == "call":
+            name, nargs = op[1], op[2]
+            if nargs:
+                args = stack[-nargs:]
+                del stack[-nargs:]
+            else:
+                args = []
+            func = resolve_builtin(name, args)
+            if func is not None:
+                try:
+                    stack.append(func(*args))
+                except Exception as e:
+                    raise ValueError(f"Error in builtin function {name}: {e}")
+            elif name in functions:
+                res = run_function_call(name, args)
+                stack.append(res[0] if res else 0.0)
+            else:
+                raise ValueError(f"Unknown function: {name}")
+        else:  # ("store", slot)
+            slots[op[1]] = stack.pop()
+
+#─── Python Codegen ──────────────────────────────────────────────────────────────
+# The fastest execution tier: each function body is translated to real Python
+# source and compiled once with compile()+exec, so calls run as native CPython
+# bytecode under ceval. Name/function resolution stays dynamic (at call time)
+# via the _call/_g helpers so semantics match the interpreted tiers exactly.
+
+def call_by_name(name, *args):
+    func = resolve_builtin(name, args)
+    if func is not None:
+        try:
+            return func(*args)
+        except Exception as e:
+            raise ValueError(f"Error in builtin function {name}: {e}")
+    if name in functions:
+        res = run_function_call(name, list(args))
+        return res[0] if res else 0.0
+    raise ValueError(f"Unknown function: {name}")
+
+def lookup_global(name):
+    if name in vars:
+        return vars[name]
+    raise ValueError(f"Unrecognized token or variable: {name}")
+
+def num_literal(v):
+    # repr of inf/nan is not valid source (bare names); spell them as
+    # float() calls. Reachable from 1e999 in a body or overflowed folds.
+    return repr(v) if math.isfinite(v) else f"float('{v!r}')"
+
+def ast_to_python(node, local_names):
+    tag = node[0]
+    if tag == "num":
+        return num_literal(node[1])
+    if tag == "var":
+        name = node[1]
+        return name if name in local_names else f"_g({name!r})"
+    if tag == "call":
+        parts = [repr(node[1])] + [ast_to_python(a, local_names) for a in node[2]]
+        return f"_call({', '.join(parts)})"
+    op = "**" if node[1] == "^" else node[1]
+    return f"({ast_to_python(node[2], local_names)} {op} {ast_to_python(node[3], local_names)})"
+
+def build_callable_source(args, outputs, compiled_body):
+    all_names = set(args) | {lhs for lhs, _ in compiled_body} | set(outputs)
+    if not all(n.isidentifier() for n in all_names):
+        return None  # name can't be a Python identifier; bytecode tier handles it
+    if all_names & {"_call", "_g"}:
+        return None  # a local would shadow the runtime helpers; use bytecode
+
+    assigned = set(args)
+    src = [f"def _fn(_call, _g, {', '.join(args)}):"]
+    for lhs, ast in compiled_body:
+        src.append(f"    {lhs} = {ast_to_python(ast, assigned)}")
+        assigned.add(lhs)
+    rets = ", ".join(o if o in assigned else "0.0" for o in outputs)
+    src.append(f"    return ({rets},)" if rets else "    return ()")
+    return "\n".join(src)
+
+def compile_callable_source(name, src):
+    ns = {}
+    try:
+        exec(compile(src, f"<nm:{name}>", "exec"), ns)
+    except SyntaxError:
+        return None
+    return ns["_fn"]
+
+#─── Numba JIT ───────────────────────────────────────────────────────────────────
+# Highest tier, used when numba is installed: bodies made of nothing but
+# arithmetic on locals and whitelisted scalar math builtins are emitted as
+# standalone Python source (math.* calls, no interpreter helpers) and
+# njit-compiled to machine code on first scalar call.
+
+JIT_BUILTINS = {
+    "sin", "cos", "tan", "asin", "acos", "atan", "sinh", "cosh", "tanh",
+    "exp", "log", "log10", "sqrt", "pow", "fabs", "floor", "ceil",
+}
+
+def jit_compatible(args, compiled_body):
+    local = set(args)
+
+    def ok(node):
+        tag = node[0]
+        if tag == "num":
+            return True
+        if tag == "var":
+            return node[1] in local  # no global reads in machine code
+        if tag == "call":
+            return node[1] in JIT_BUILTINS and all(ok(a) for a in node[2])
+        return ok(node[2]) and ok(node[3])
+
+    for lhs, ast in compiled_body:
+        if not ok(ast):
+            return False
+        local.add(lhs)
+    return True
+
+def ast_to_jit_python(node):
+    tag = node[0]
+    if tag == "num":
+        return num_literal(node[1])
+    if tag == "var":
+        return node[1]
+    if tag == "call":
+        return f"math.{node[1]}({', '.join(ast_to_jit_python(a) for a in node[2])})"
+    op = "**" if node[1] == "^" else node[1]
+    return f"({ast_to_jit_python(node[2])} {op} {ast_to_jit_python(node[3])})"
+
+def compile_to_jit_source(args, outputs, compiled_body):
+    if numba is None or not jit_compatible(args, compiled_body):
+        return None
+    all_names = set(args) | {lhs for lhs, _ in compiled_body} | set(outputs)
+    if not all(n.isidentifier() for n in all_names):
+        return None
+
+    assigned = set(args)
+    src = [f"def _fn({', '.join(args)}):"]
+    for lhs, ast in compiled_body:
+        src.append(f"    {lhs} = {ast_to_jit_python(ast)}")
+        assigned.add(lhs)
+    rets = ", ".join(o if o in assigned else "0.0" for o in outputs)
+    src.append(f"    return ({rets},)" if rets else "    return ()")
+    return "\n".join(src)
 
 #─── Tokenizer ───────────────────────────────────────────────────────────────────
 
+# One operator/bracket character, or a run of alnum/dot/underscore — the same
+# token classes the old char-by-char loop produced, in a single C-level sweep.
+# Whitespace falls in the gaps between matches and is skipped for free.
+_TOKEN_RE = re.compile(r"[()+\-*/^,\[\]]|[A-Za-z0-9_.]+")
+
 def tokenize(s):
-    tokens = []
-    i = 0
-    while i < len(s):
-        c = s[i]
-        if c in "()+-*/^,[]":
-            tokens.append(c)
-            i += 1
-        elif c.isspace():
-            i += 1
-        else:
-            j = i
-            while j < len(s) and (s[j].isalnum() or s[j] == "."):
-                j += 1
-            tokens.append(s[i:j])
-            i = j
-    return tokens
+    # Intern identifiers so later dict lookups hash/compare by pointer
+    return [sys.intern(t) if t[0].isalpha() else t
+            for t in _TOKEN_RE.findall(s)]
 
 #─── Function Definition ─────────────────────────────────────────────────────────
 
+# Full "[outs] = def name(args)" header, captured in one pass, and the cheap
+# prefix test the line-by-line loaders use to spot a definition starting
+_DEF_HEADER_RE = re.compile(
+    r"^\s*\[(?P<outs>[^\]]*)\]\s*=\s*def\s*(?P<name>\w+)\s*\((?P<args>[^)]*)\)\s*$")
+_DEF_LINE_RE = re.compile(r"^\s*\[.*\]\s*=\s*def\b")
+
 def parse_function_definition(lines):
-    header = lines[0].strip()
-    
-    # Check if the function definition starts with an assignment, then extract the function part
-    if "= def" in header:
-        out_part, rest = header.split("=", 1)
-        func_part = rest.strip()
-    else:
-        raise ValueError(f"Invalid function definition header: {header}")
-    
-    # Extract function name and arguments
-    if "def" not in func_part:
-        raise ValueError(f"Invalid function definition header: {func_part}")
-    
-    func_part = func_part.split("def", 1)[1].strip()
-    name, args_str = func_part.split("(", 1)
-    args = [a.strip() for a in args_str.rstrip(")").split(",") if a.strip()]
-    outputs = [o.strip() for o in out_part.strip()[1:-1].split(",") if o.strip()]
+    # One anchored match extracts outputs, name, and args — no repeated
+    # substring scans over the header
+    m = _DEF_HEADER_RE.match(lines[0])
+    if m is None:
+        raise ValueError(f"Invalid function definition header: {lines[0].strip()}")
+
+    name = m.group("name")
+    args = [a.strip() for a in m.group("args").split(",") if a.strip()]
+    outputs = [o.strip() for o in m.group("outs").split(",") if o.strip()]
     body = lines[1:-1]  # The function body is everything except the header and "end"
-    
-    functions[name.strip()] = {"args": args, "outputs": outputs, "body": body}
+
+    # Compile each assignment line to an AST once (constant-folded against
+    # the names that are local up to that line), so calls skip the parser
+    compiled_body = []
+    local_names = set(args)
+    for line in body:
+        if "=" in line:
+            lhs, expr = line.split("=", 1)
+            lhs = sys.intern(lhs.strip())
+            ast = fold(parse_to_ast(tokenize(expr.strip())), local_names)
+            compiled_body.append((lhs, ast))
+            local_names.add(lhs)
+
+    # Flatten the whole body to one bytecode program for the stack machine
+    bytecode, slot_map = compile_body_to_bc(args, compiled_body)
+
+    callable_src = build_callable_source(args, outputs, compiled_body)
+    functions[name] = {"args": args, "outputs": outputs, "body": body,
+                       "compiled_body": compiled_body,
+                       "bytecode": bytecode,
+                       "nslots": len(slot_map),
+                       "out_slots": [slot_map.get(o) for o in outputs],
+                       "callable_src": callable_src,
+                       "callable": (compile_callable_source(name, callable_src)
+                                    if callable_src else None),
+                       "jit_src": compile_to_jit_source(args, outputs,
+                                                        compiled_body),
+                       "jit": None}
+    return name
 
 #─── Load .nm Files ──────────────────────────────────────────────────────────────
+# Parsed definitions are cached on disk per source file, keyed by the file's
+# mtime+size, so an unchanged Data/ directory costs one stat per file on
+# startup instead of a full tokenize/parse/fold pass. Only the plain-data
+# parts of an entry are pickled; bytecode and callables are rebuilt from the
+# cached ASTs/source on load. Caching is best-effort throughout — any miss,
+# version bump, or I/O problem just falls back to parsing.
+
+_CACHE_DIR = ".nmcache"
+_CACHE_VERSION = 1
+# jit_src is deliberately not cached: it depends on whether numba is
+# installed, so it is recomputed from the cached ASTs on revive
+_CACHED_KEYS = ("args", "outputs", "body", "compiled_body", "callable_src")
+
+def _cache_path(path):
+    key = hashlib.sha1(os.path.abspath(path).encode()).hexdigest()
+    return os.path.join(_CACHE_DIR, key + ".pkl")
+
+def _read_def_cache(path):
+    try:
+        st = os.stat(path)
+        with open(_cache_path(path), "rb") as f:
+            cached = pickle.load(f)
+    except (OSError, pickle.PickleError, EOFError):
+        return None
+    if (cached.get("version") != _CACHE_VERSION
+            or cached.get("mtime") != st.st_mtime
+            or cached.get("size") != st.st_size):
+        return None
+    return cached["defs"]
+
+def _write_def_cache(path, defs):
+    picklable = {name: {k: entry[k] for k in _CACHED_KEYS}
+                 for name, entry in defs.items()}
+    try:
+        st = os.stat(path)
+        os.makedirs(_CACHE_DIR, exist_ok=True)
+        with open(_cache_path(path), "wb") as f:
+            pickle.dump({"version": _CACHE_VERSION, "mtime": st.st_mtime,
+                         "size": st.st_size, "defs": picklable}, f)
+    except OSError:
+        pass
+
+def _revive_definition(name, entry):
+    # Rebuild the derived execution tiers from the cached ASTs and sources
+    bytecode, slot_map = compile_body_to_bc(entry["args"], entry["compiled_body"])
+    entry["bytecode"] = bytecode
+    entry["nslots"] = len(slot_map)
+    entry["out_slots"] = [slot_map.get(o) for o in entry["outputs"]]
+    src = entry["callable_src"]
+    entry["callable"] = compile_callable_source(name, src) if src else None
+    entry["jit_src"] = compile_to_jit_source(entry["args"], entry["outputs"],
+                                             entry["compiled_body"])
+    entry["jit"] = None
+    functions[name] = entry
 
 def load_functions_from_file(path):
-    lines = [l.rstrip("\n") for l in open(path)]
+    cached = _read_def_cache(path)
+    if cached is not None:
+        for name, entry in cached.items():
+            _revive_definition(name, entry)
+        return
+
+    # Stream one line at a time — no full-file list, and the handle is closed
+    defined = {}
     buf = []
-    for line in lines:
-        if "= def" in line:
-            buf = [line]
-        elif buf:
-            buf.append(line)
-            if line.strip() == "end":
-                parse_function_definition(buf)
-                buf = []
+    with open(path) as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if _DEF_LINE_RE.match(line):
+                buf = [line]
+            elif buf:
+                buf.append(line)
+                if line.strip() == "end":
+                    fname = parse_function_definition(buf)
+                    defined[fname] = functions[fname]
+                    buf = []
+    _write_def_cache(path, defined)
+
+def _walk_nm_files(dir):
+    # os.scandir reuses the dirent's cached type info, so no extra stat per
+    # entry and no intermediate dirs/files lists like os.walk builds
+    try:
+        it = os.scandir(dir)
+    except OSError:  # missing/unreadable directory — os.walk ignored these too
+        return
+    with it:
+        for e in it:
+            if e.is_dir(follow_symlinks=False):
+                yield from _walk_nm_files(e.path)
+            elif e.name.endswith(".nm"):
+                yield e.path
 
 def load_functions_from_directory(dir):
-    for root, dirs, files in os.walk(dir):
-        for fn in files:
-            if fn.endswith(".nm"):
-                load_functions_from_file(os.path.join(root, fn))
+    for path in _walk_nm_files(dir):
+        load_functions_from_file(path)
 
 #─── Function Execution ─────────────────────────────────────────────────────────
 
 def run_function_call(name, args):
-    # First check if it's a built-in function
-    if name in builtin_functions:
+    # First check if it's a built-in function (one lookup resolves it)
+    func = resolve_builtin(name, args)
+    if func is not None:
         try:
-            return [builtin_functions[name](*args)]
+            return [func(*args)]
         except Exception as e:
             raise ValueError(f"Error in builtin function {name}: {e}")
     
@@ -184,28 +643,74 @@ def run_function_call(name, args):
     if len(args) != len(f["args"]):
         raise ValueError(f"Arg count mismatch for: {name}")
     
-    saved = vars.copy()
-    vars.clear()
-    
-    for arg_name, arg_val in zip(f["args"], args):
-        vars[arg_name] = arg_val
-    
-    for line in f["body"]:
-        if "=" in line:
-            lhs, expr = line.split("=", 1)
-            lhs = lhs.strip(); expr = expr.strip()
-            toks = tokenize(expr)
-            vars[lhs] = eval_expr(toks)
-    
-    res = [vars.get(o, 0.0) for o in f["outputs"]]
-    
-    vars.clear()
-    vars.update(saved)
-    
-    return res
+    # Bind arguments into a fresh per-call scope; eval_ast falls back to the
+    # global vars for anything not bound locally (so e.g. pi resolves).
+    # JIT tier: machine code for pure-arithmetic bodies on scalar args.
+    # First call pays the njit compile; a failed compile is marked False
+    # so it is never retried.
+    if f["jit_src"] is not None and f["jit"] is not False and \
+            all(isinstance(a, (int, float)) for a in args):
+        if f["jit"] is None:
+            ns = {"math": math}
+            try:
+                exec(compile(f["jit_src"], f"<nm-jit:{name}>", "exec"), ns)
+                f["jit"] = numba.njit(ns["_fn"])
+            except SyntaxError:  # e.g. a local named like a Python keyword
+                f["jit"] = False
+        if f["jit"] is not False:
+            try:
+                return list(f["jit"](*args))
+            except ZeroDivisionError:
+                raise ValueError("Division by zero")
+            except Exception:
+                f["jit"] = False  # numba rejected it; use the Python tiers
+
+    fn = f["callable"]
+    if fn is not None:
+        try:
+            return list(fn(call_by_name, lookup_global, *args))
+        except ZeroDivisionError:
+            raise ValueError("Division by zero")
+
+    # Fallback tier for bodies that couldn't be codegen'd
+    slots = list(args) + [0.0] * (f["nslots"] - len(args))
+    exec_bytecode(f["bytecode"], slots)
+    return [slots[i] if i is not None else 0.0 for i in f["out_slots"]]
 
 #─── REPL ───────────────────────────────────────────────────────────────────────
 
+# Expression source → AST, so re-typed/pasted REPL input skips tokenize+parse.
+# Plain dict doubles as an LRU: hits are reinserted, the oldest key is evicted.
+_expr_cache = {}
+_EXPR_CACHE_MAX = 512
+
+def parse_call_args(rest):
+    # Shared by both REPL call branches: each argument is a variable name
+    # or a bare number, comma-separated, with the trailing ")" still attached
+    args = []
+    for arg in rest.rstrip(" )").split(","):
+        arg = arg.strip()
+        v = vars.get(arg)
+        if v is not None:
+            args.append(v)
+        else:
+            try:
+                args.append(float(arg))
+            except ValueError:
+                raise ValueError(f"Invalid argument: {arg}")
+    return args
+
+def get_cached_ast(expr):
+    node = _expr_cache.get(expr)
+    if node is not None:
+        del _expr_cache[expr]      # move to newest position
+    else:
+        node = parse_to_ast(tokenize(expr))
+        if len(_expr_cache) >= _EXPR_CACHE_MAX:
+            del _expr_cache[next(iter(_expr_cache))]
+    _expr_cache[expr] = node
+    return node
+
 def main_loop():
     while True:
         inp = input("> ").strip()
@@ -222,12 +727,12 @@ def main_loop():
         
         if inp == "help":
             print("Available built-in functions:")
-            for k in sorted(builtin_functions.keys()):
+            for k in available_builtin_names():
                 print("  ", k)
             continue
 
         # define function
-        if "= def" in inp:
+        if _DEF_LINE_RE.match(inp):
             buf = [inp]
             while True:
                 nxt = input(">> ").rstrip("\n")
@@ -241,22 +746,7 @@ def main_loop():
             left, call = inp.split("=", 1)
             outs = [o.strip() for o in left.strip()[1:-1].split(",")]
             name, rest = call.split("(", 1)
-            
-            # Modify argument parsing to handle variables like pi
-            args = []
-            for arg in rest.rstrip(")").split(","):
-                arg = arg.strip()
-                # Check if the argument is a variable
-                if arg in vars:
-                    args.append(vars[arg])
-                else:
-                    # Convert to float if it's a number
-                    try:
-                        args.append(float(arg))
-                    except ValueError:
-                        raise ValueError(f"Invalid argument: {arg}")
-            
-            res = run_function_call(name.strip(), args)
+            res = run_function_call(name.strip(), parse_call_args(rest))
             for o, val in zip(outs, res):
                 vars[o] = val
                 print(f"{o} = {val}")
@@ -265,22 +755,7 @@ def main_loop():
         # bare function call
         if "(" in inp:
             name, rest = inp.split("(", 1)
-            
-            # Modify argument parsing to handle variables like pi
-            args = []
-            for arg in rest.rstrip(")").split(","):
-                arg = arg.strip()
-                # Check if the argument is a variable
-                if arg in vars:
-                    args.append(vars[arg])
-                else:
-                    # Convert to float if it's a number
-                    try:
-                        args.append(float(arg))
-                    except ValueError:
-                        raise ValueError(f"Invalid argument: {arg}")
-            
-            res = run_function_call(name.strip(), args)
+            res = run_function_call(name.strip(), parse_call_args(rest))
             if res:
                 print(res[0] if len(res) == 1 else res)
             continue
@@ -288,7 +763,7 @@ def main_loop():
         # simple assignment
         if "=" in inp:
             n, e = inp.split("=", 1)
-            v = eval_expr(tokenize(e.strip()))
+            v = eval_ast(get_cached_ast(e.strip()), vars)
             vars[n.strip()] = v
             print(f"{n.strip()} = {v}")
             continue
@@ -297,7 +772,7 @@ def main_loop():
         if inp in vars:
             print(f"{inp} = {vars[inp]}")
         else:
-            print("Result =", eval_expr(tokenize(inp)))
+            print("Result =", eval_ast(get_cached_ast(inp), vars))
 
 
 if __name__ == "__main__":